@@ -0,0 +1,68 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collect items submitted from many threads and process them in batches of up to max_batch_size, waiting at most max_wait seconds"""
+
+    def __init__(self, process_batch, max_batch_size=32, max_wait=0.1):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {'batches': 0, 'items': 0}
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if len(results) != len(batch):
+                error = RuntimeError(f'process_batch returned {len(results)} results for {len(batch)} items')
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+
+            with self._lock:
+                self._stats['batches'] += 1
+                self._stats['items'] += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def submit(self, item):
+        """Queue ``item`` for the next batch and wait for its result"""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future.result()
+
+    def get_stats(self):
+        """Get the number of batches run and items processed"""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,10 @@
+from django.middleware.gzip import GZipMiddleware
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses, except Server-Sent Events, which gzip would buffer until the stream ends"""
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
@@ -71,8 +71,17 @@ class Migration(migrations.Migration):
                 ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='teamB_LLM.datasource')),
             ],
         ),
+        
+        # HNSW index so similarity search is a graph traversal, not a full scan
+        migrations.RunSQL(
+            "SET LOCAL maintenance_work_mem = '2GB'; "
+            "SET LOCAL max_parallel_maintenance_workers = 7; "
+            "CREATE INDEX document_embedding_hnsw ON \"teamB_LLM_document\" "
+            "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64);",
+            reverse_sql="DROP INDEX IF EXISTS document_embedding_hnsw;"
+        ),
         migrations.AddIndex(
             model_name='document',
-            index=models.Index(fields=['source', 'chunk_index'], name='teamB_LLM_d_source__f8e5a9_idx'),
+            index=models.Index(fields=['source', 'chunk_index'], name='teamB_LLM_d_source__386d41_idx'),
         ),
     ]
\ No newline at end of file
@@ -0,0 +1,36 @@
+# Store embeddings as halfvec (FP16) to halve the bytes read per HNSW hop
+
+from django.db import migrations
+import pgvector.django
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teamB_LLM', '0001_initial'),
+    ]
+
+    operations = [
+        # vector_l2_ops cannot index a halfvec column, so rebuild around the type change
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS document_embedding_hnsw;",
+            reverse_sql=(
+                "CREATE INDEX document_embedding_hnsw ON \"teamB_LLM_document\" "
+                "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64);"
+            )
+        ),
+        
+        migrations.AlterField(
+            model_name='document',
+            name='embedding',
+            field=pgvector.django.HalfVectorField(dimensions=384),
+        ),
+        
+        migrations.RunSQL(
+            "SET LOCAL maintenance_work_mem = '2GB'; "
+            "SET LOCAL max_parallel_maintenance_workers = 7; "
+            "CREATE INDEX document_embedding_hnsw ON \"teamB_LLM_document\" "
+            "USING hnsw (embedding halfvec_l2_ops) WITH (m = 16, ef_construction = 64);",
+            reverse_sql="DROP INDEX IF EXISTS document_embedding_hnsw;"
+        ),
+    ]
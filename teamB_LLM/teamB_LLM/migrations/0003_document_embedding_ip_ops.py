@@ -0,0 +1,39 @@
+# Normalize stored embeddings and index them for inner-product search
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teamB_LLM', '0002_document_embedding_halfvec'),
+    ]
+
+    operations = [
+        # Drop the L2 index first so the UPDATE does not re-insert every row
+        # into a graph that is about to be rebuilt; the reverse of the index
+        # rebuild below restores it
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS document_embedding_hnsw;",
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        
+        # Inner product equals cosine similarity only for unit vectors
+        migrations.RunSQL(
+            "UPDATE \"teamB_LLM_document\" SET embedding = l2_normalize(embedding);",
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS document_embedding_hnsw; "
+            "SET LOCAL maintenance_work_mem = '2GB'; "
+            "SET LOCAL max_parallel_maintenance_workers = 7; "
+            "CREATE INDEX document_embedding_hnsw ON \"teamB_LLM_document\" "
+            "USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64);",
+            reverse_sql=(
+                "DROP INDEX IF EXISTS document_embedding_hnsw; "
+                "CREATE INDEX document_embedding_hnsw ON \"teamB_LLM_document\" "
+                "USING hnsw (embedding halfvec_l2_ops) WITH (m = 16, ef_construction = 64);"
+            )
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-15 22:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teamB_LLM', '0003_document_embedding_ip_ops'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='teamB_LLM_c_user_id_fbb2d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['status'], name='teamB_LLM_d_status_81a155_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasource',
+            index=models.Index(fields=['source_type', 'status'], name='teamB_LLM_d_source__aad805_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['session', 'timestamp', 'id'], name='teamB_LLM_m_session_d3be59_idx'),
+        ),
+    ]
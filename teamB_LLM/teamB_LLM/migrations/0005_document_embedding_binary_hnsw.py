@@ -0,0 +1,15 @@
+# The binary-quantized HNSW index (document_embedding_binary_hnsw) depends on
+# the BINARY_QUANTIZE_CANDIDATES setting, so VectorRAGService.configure_hnsw_params
+# creates and drops it rather than a migration; the schema stays the same
+# whatever the settings were when migrate ran
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teamB_LLM', '0004_query_indexes'),
+    ]
+
+    operations = []
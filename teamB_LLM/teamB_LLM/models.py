@@ -1,6 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
-from pgvector.django import VectorField
+from pgvector.django import HalfVectorField
 import uuid
 
 class ChatSession(models.Model):
@@ -9,6 +9,11 @@ class ChatSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+    
     def __str__(self):
         return f"Session {self.session_id}"
 
@@ -20,6 +25,9 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['session', 'timestamp', 'id']),
+        ]
     
     def __str__(self):
         return f"{'User' if self.is_user else 'Bot'}: {self.content[:50]}"
@@ -47,13 +55,19 @@ class DataSource(models.Model):
     document_count = models.IntegerField(default=0)
     metadata = models.JSONField(default=dict, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status']),
+            models.Index(fields=['source_type', 'status']),
+        ]
+    
     def __str__(self):
         return f"{self.name} ({self.source_type})"
 class Document(models.Model):
     """Store document chunks with vector embeddings"""
     source = models.ForeignKey(DataSource, on_delete=models.CASCADE, related_name='documents')
     content = models.TextField()
-    embedding = VectorField(dimensions=384)  # For all-MiniLM-L6-v2
+    embedding = HalfVectorField(dimensions=384)  # For all-MiniLM-L6-v2, stored as FP16
     metadata = models.JSONField(default=dict)
     chunk_index = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
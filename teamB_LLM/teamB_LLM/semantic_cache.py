@@ -0,0 +1,90 @@
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+class SemanticCache:
+    """Cache values by query embedding so near-duplicate queries (cosine >= threshold, found via LSH buckets) share a result"""
+
+    def __init__(self, dim, threshold=0.95, max_entries=1024, ttl=600, n_tables=4, n_bits=8, seed=0):
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # entry id -> (key, buckets, vector, value, expires_at)
+        self._buckets = {}             # (key, table, bucket) -> set of entry ids
+        self._next_id = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def _hash(self, vector):
+        """LSH bucket of the vector in each table"""
+        bits = (self._planes @ vector) > 0
+        return [bytes(np.packbits(table_bits)) for table_bits in bits]
+
+    def _remove(self, entry_id):
+        key, buckets, _, _, _ = self._entries.pop(entry_id)
+        for table, bucket in enumerate(buckets):
+            members = self._buckets.get((key, table, bucket))
+            if members is not None:
+                members.discard(entry_id)
+                if not members:
+                    del self._buckets[(key, table, bucket)]
+
+    def get(self, key, vector):
+        """Return the value cached for a query similar to ``vector`` under ``key``, or None"""
+        buckets = self._hash(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            candidates = set()
+            for table, bucket in enumerate(buckets):
+                candidates |= self._buckets.get((key, table, bucket), set())
+
+            best_id, best_similarity = None, self.threshold
+            for entry_id in candidates:
+                _, _, cached_vector, _, expires_at = self._entries[entry_id]
+                if expires_at <= now:
+                    self._remove(entry_id)
+                    self._stats['expirations'] += 1
+                    continue
+                similarity = float(cached_vector @ vector)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self._stats['hits'] += 1
+            return self._entries[best_id][3]
+
+    def set(self, key, vector, value):
+        """Cache ``value`` for the query ``vector`` under ``key``"""
+        buckets = self._hash(vector)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, buckets, vector, value, time.monotonic() + self.ttl)
+            for table, bucket in enumerate(buckets):
+                self._buckets.setdefault((key, table, bucket), set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def get_stats(self):
+        """Get hit/miss/eviction counters and the current size"""
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries)}
@@ -1,25 +1,143 @@
 import os
+import time
+import io
+import re
+import json
+import struct
 import requests
 import git
 import shutil
+import hashlib
+import queue
+import threading
 import numpy as np
+import torch
+from itertools import islice
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 from django.conf import settings
-from django.db import transaction
-from pgvector.django import L2Distance
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.db.models import Case, Count, F, TextField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from pgvector.django import MaxInnerProduct
 
 from sentence_transformers import SentenceTransformer
-from langchain.document_loaders import TextLoader, DirectoryLoader
+from langchain.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document as LangchainDocument
 
 from .models import DataSource, Document
+from .micro_batcher import MicroBatcher
+from .semantic_cache import SemanticCache
+
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+HNSW_INDEX_NAME = 'document_embedding_hnsw'
+BINARY_HNSW_INDEX_NAME = 'document_embedding_binary_hnsw'
+HNSW_MAX_EF_SEARCH = 1000  # Upper bound pgvector accepts for hnsw.ef_search
+
+# Django cache key of the corpus version, bumped after every ingest or delete
+CORPUS_VERSION_CACHE_KEY = 'rag:corpus_version'
+
+# pg_advisory_lock key held shared by running bulk loads and exclusively while
+# the HNSW indexes are rebuilt
+BULK_LOAD_LOCK_ID = 0x68_6e_73_77
+BULK_LOAD_LOCK_POLL_INTERVAL = 1  # Seconds between attempts while a rebuild holds it
+INDEX_SWAP_ATTEMPTS = 10  # Tries at the brief table lock that swaps in a rebuilt index
+
+# Framing for COPY ... WITH (FORMAT binary)
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+POSTGRES_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+# Runs of whitespace collapsed when cleaning scraped text
+WHITESPACE_RE = re.compile(r'\s+')
+
+# File types loaded from GitHub repositories
+GITHUB_FILE_EXTENSIONS = ('py', 'js', 'ts', 'jsx', 'tsx', 'md', 'txt', 'rst', 'yml', 'yaml', 'json')
+
+@dataclass(slots=True)
+class SearchHit:
+    """A search result in the langchain Document shape (page_content + metadata)"""
+    page_content: str
+    metadata: dict
+
+def iter_in_background(iterable, maxsize):
+    """Consume an iterable on a background thread, buffering up to maxsize items"""
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    errors = []
+    
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if not stop.is_set():
+                items.put(done)
+    
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        # Unblock the producer if the consumer stopped early
+        stop.set()
+        while not items.empty():
+            items.get_nowait()
+    
+    if errors:
+        raise errors[0]
+
+def get_hnsw_params(document_count):
+    """Pick HNSW build/search parameters for the size of the corpus"""
+    if document_count < 100_000:
+        return {'m': 16, 'ef_construction': 64, 'ef_search': 40}
+    if document_count < 1_000_000:
+        return {'m': 24, 'ef_construction': 100, 'ef_search': 100}
+    return {'m': 32, 'ef_construction': 128, 'ef_search': 200}
 
 class VectorRAGService:
     def __init__(self):
-        # Initialize the embedding model
-        self.embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # HNSW parameters for the current corpus size, resolved lazily and
+        # again whenever the shared corpus version moves
+        self.hnsw_params = None
+        self._hnsw_params_version = None
+        
+        # Shared HTTP session so page fetches reuse pooled connections
+        self.http_session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.http_session.mount('http://', adapter)
+        self.http_session.mount('https://', adapter)
+        
+        # Initialize the embedding model, on the GPU with FP16 weights when available
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=self.device)
+        if self.device == 'cuda':
+            self.embedding_model.half()
+        self.embedding_batch_size = 256 if self.device == 'cuda' else 64
         
         # Text splitter for chunking documents
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -27,14 +145,169 @@ class VectorRAGService:
             chunk_overlap=200,
             separators=["\n\n", "\n", " ", ""]
         )
+        
+        # Exact-text query embedding cache (LRU)
+        self._cache_lock = threading.Lock()
+        self._emb_cache = OrderedDict()
+        self._emb_cache_size = 2000
+        self._cache_stats = {
+            'embedding_hits': 0,
+            'embedding_misses': 0,
+            'embedding_evictions': 0
+        }
+        
+        # Query embeddings that miss the cache are collated across concurrent
+        # requests into one forward pass
+        self.query_batcher = MicroBatcher(
+            self.generate_embeddings_batch,
+            max_batch_size=getattr(settings, 'EMBEDDING_BATCH_MAX_SIZE', 32),
+            max_wait=getattr(settings, 'EMBEDDING_BATCH_WINDOW', 0.1)
+        )
+        
+        # Semantic cache of search results keyed by the query embedding
+        self.result_cache = SemanticCache(
+            settings.VECTOR_DIMENSION,
+            threshold=getattr(settings, 'SEMANTIC_CACHE_THRESHOLD', 0.95),
+            max_entries=getattr(settings, 'SEMANTIC_CACHE_SIZE', 1024),
+            ttl=getattr(settings, 'SEMANTIC_CACHE_TTL', 600)
+        )
     
     def generate_embedding(self, text):
         """Generate embedding for text"""
-        embedding = self.embedding_model.encode(text, convert_to_tensor=False)
-        return embedding.tolist()
+        key = hashlib.sha256(text.encode('utf-8')).digest()
+        with self._cache_lock:
+            embedding = self._emb_cache.get(key)
+            if embedding is not None:
+                self._emb_cache.move_to_end(key)
+                self._cache_stats['embedding_hits'] += 1
+                return embedding
+            self._cache_stats['embedding_misses'] += 1
+        
+        # Copy the row out of the batch array so the caches below do not keep
+        # the whole batch alive
+        embedding = self.query_batcher.submit(text).copy()
+        
+        with self._cache_lock:
+            self._emb_cache[key] = embedding
+            if len(self._emb_cache) > self._emb_cache_size:
+                self._emb_cache.popitem(last=False)
+                self._cache_stats['embedding_evictions'] += 1
+        return embedding
+    
+    def generate_embeddings_batch(self, texts):
+        """Generate embeddings for many texts in one batched forward pass"""
+        return self.embedding_model.encode(
+            texts,
+            batch_size=self.embedding_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32, copy=False)
+    
+    def _split_documents(self, documents, batch_size=32):
+        """Split documents into (chunk_index, chunk) pairs"""
+        documents = iter(documents)
+        chunk_counts = {}
+        while True:
+            batch = list(islice(documents, batch_size))
+            if not batch:
+                break
+            
+            # Split many documents per call; the splitter keeps each chunk's
+            # source metadata, which numbers chunks within their document
+            for chunk in self.text_splitter.split_documents(batch):
+                source = chunk.metadata.get('source')
+                chunk_index = chunk_counts.get(source, 0)
+                chunk_counts[source] = chunk_index + 1
+                yield chunk_index, chunk
+    
+    def _embed_chunks(self, data_source, indexed_chunks):
+        """Embed (chunk_index, chunk) pairs into unsaved Document rows"""
+        if not indexed_chunks:
+            return []
+        
+        # Embed all chunks in one batch
+        embeddings = self.generate_embeddings_batch(
+            [chunk.page_content for _, chunk in indexed_chunks]
+        )
+        
+        return [
+            Document(
+                source=data_source,
+                content=chunk.page_content,
+                embedding=embedding,
+                metadata=chunk.metadata,
+                chunk_index=i
+            )
+            for (i, chunk), embedding in zip(indexed_chunks, embeddings)
+        ]
+    
+    def _build_document_objects(self, data_source, documents):
+        """Split and embed documents into unsaved Document rows"""
+        return self._embed_chunks(data_source, list(self._split_documents(documents)))
+    
+    def _load_repo_file(self, path):
+        """Load one repository file, skipping files that cannot be decoded"""
+        try:
+            return TextLoader(str(path), autodetect_encoding=True).load()
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+            return []
     
-    def ingest_github_repo(self, repo_url, repo_name=None):
-        """Clone and ingest GitHub repository"""
+    def _iter_repo_documents(self, repo_path):
+        """Yield repository files as documents while the rest are still loading"""
+        # Skip hidden files and directories such as .git; the sparse checkout
+        # already limits the file types
+        paths = [
+            path for path in repo_path.rglob('*')
+            if path.is_file() and not any(part.startswith('.') for part in path.relative_to(repo_path).parts)
+        ]
+        
+        # Keep a bounded window of loads in flight, so only a few files are held
+        # in memory ahead of the consumer instead of the whole repository
+        max_workers = (os.cpu_count() or 1) * 2
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for path in paths:
+                if len(pending) >= max_workers * 2:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(self._load_repo_file, path))
+            while pending:
+                yield from pending.popleft().result()
+    
+    def _copy_documents(self, document_objects, batch_size=1000):
+        """Stream Document rows into Postgres with binary COPY instead of INSERTs"""
+        table = Document._meta.db_table
+        copy_sql = (
+            f'COPY "{table}" (source_id, content, embedding, metadata, chunk_index, created_at) '
+            "FROM STDIN WITH (FORMAT binary)"
+        )
+        created_at = struct.pack('>iq', 8, (timezone.now() - POSTGRES_EPOCH) // timedelta(microseconds=1))
+        
+        with connection.cursor() as cursor:
+            for start in range(0, len(document_objects), batch_size):
+                buffer = io.BytesIO()
+                buffer.write(PGCOPY_HEADER)
+                for doc in document_objects[start:start + batch_size]:
+                    content = doc.content.encode('utf-8')
+                    # halfvec binary format: int16 dims, int16 unused, big-endian FP16 values
+                    embedding = np.asarray(doc.embedding, dtype='>f2')
+                    embedding = struct.pack('>HH', embedding.shape[0], 0) + embedding.tobytes()
+                    # jsonb binary format: version byte followed by the JSON text
+                    metadata = b'\x01' + json.dumps(doc.metadata).encode('utf-8')
+                    
+                    buffer.write(struct.pack('>hiq', 6, 8, doc.source_id))
+                    buffer.write(struct.pack('>i', len(content)) + content)
+                    buffer.write(struct.pack('>i', len(embedding)) + embedding)
+                    buffer.write(struct.pack('>i', len(metadata)) + metadata)
+                    buffer.write(struct.pack('>ii', 4, doc.chunk_index))
+                    buffer.write(created_at)
+                buffer.write(PGCOPY_TRAILER)
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+    
+    def ingest_github_repo(self, repo_url, repo_name=None, data_source=None):
+        """Clone and ingest GitHub repository, into data_source if one was already created"""
         if not repo_name:
             repo_name = repo_url.split('/')[-1].replace('.git', '')
             
@@ -43,9 +316,9 @@ class VectorRAGService:
         # Clean up existing
         if temp_path.exists():
             shutil.rmtree(temp_path)
-            
-        try:
-            # Create data source record
+        
+        # Create data source record
+        if data_source is None:
             data_source = DataSource.objects.create(
                 name=repo_name,
                 source_type='github',
@@ -53,222 +326,472 @@ class VectorRAGService:
                 status='processing',
                 metadata={'repo_url': repo_url}
             )
+        
+        loading = False
+        try:
+            # Inserting into a live HNSW graph is the dominant ingest cost, so drop
+            # the indexes for the bulk load and build them once afterwards
+            self.begin_bulk_load(drop_indexes=True)
+            loading = True
             
-            # Clone repository
-            git.Repo.clone_from(repo_url, temp_path)
-            
-            # Load documents
-            loader = DirectoryLoader(
-                str(temp_path),
-                glob="**/*.{py,js,ts,jsx,tsx,md,txt,rst,yml,yaml,json}",
-                show_progress=False
+            # Shallow, blobless clone that only checks out the file types we load
+            repo = git.Repo.clone_from(
+                repo_url,
+                temp_path,
+                depth=1,
+                single_branch=True,
+                no_checkout=True,
+                filter='blob:none'
             )
-            documents = loader.load()
+            repo.git.sparse_checkout('set', '--no-cone', *[f'*.{ext}' for ext in GITHUB_FILE_EXTENSIONS])
+            repo.git.checkout()
             
-            # Process and store documents
-            doc_count = 0
-            with transaction.atomic():
-                for doc in documents:
+            def load_documents():
+                for doc in self._iter_repo_documents(temp_path):
                     # Add metadata
                     doc.metadata.update({
                         "source_type": "github",
                         "repo_url": repo_url,
                         "repo_name": repo_name
                     })
-                    
-                    # Split document into chunks
-                    chunks = self.text_splitter.split_documents([doc])
-                    
-                    for i, chunk in enumerate(chunks):
-                        # Generate embedding
-                        embedding = self.generate_embedding(chunk.page_content)
-                        
-                        # Store in database
-                        Document.objects.create(
-                            source=data_source,
-                            content=chunk.page_content,
-                            embedding=embedding,
-                            metadata=chunk.metadata,
-                            chunk_index=i
-                        )
-                        doc_count += 1
+                    yield doc
+            
+            # Pipeline the ingest: files load on a thread pool and are split on
+            # a second thread while this thread embeds and stores earlier batches
+            documents = iter_in_background(load_documents(), maxsize=32)
+            indexed_chunks = iter_in_background(self._split_documents(documents), maxsize=self.embedding_batch_size * 4)
+            
+            doc_count = 0
+            with transaction.atomic():
+                while True:
+                    batch = list(islice(indexed_chunks, self.embedding_batch_size))
+                    if not batch:
+                        break
+                    self._copy_documents(self._embed_chunks(data_source, batch))
+                    doc_count += len(batch)
                 
                 # Update data source
                 data_source.status = 'completed'
                 data_source.document_count = doc_count
                 data_source.save()
             
-            # Cleanup
-            shutil.rmtree(temp_path)
-            
-            return doc_count
-            
         except Exception as e:
+            # Update status to failed
+            data_source.status = 'failed'
+            data_source.save()
+            raise e
+        
+        finally:
+            # Cleanup
             if temp_path.exists():
                 shutil.rmtree(temp_path)
             
-            # Update status to failed
-            if 'data_source' in locals():
-                data_source.status = 'failed'
-                data_source.save()
+            # Runs once the source's status is settled, so an index build
+            # error can no longer mark committed documents as failed
+            if loading:
+                self.end_bulk_load()
+        
+        self.clear_result_cache()
+        return doc_count
+    
+    def _fetch_and_clean(self, url):
+        """Download a web page and extract its visible text"""
+        try:
+            response = self.http_session.get(url, timeout=10)
+            response.raise_for_status()
             
-            raise e
+            tree = HTMLParser(response.content)
+            
+            # Remove script and style elements
+            for node in tree.css('script, style'):
+                node.decompose()
+            
+            root = tree.body or tree.root
+            text = root.text(separator=' ') if root else ''
+            
+            # Clean up text
+            text = WHITESPACE_RE.sub(' ', text).strip()
+            
+            if text:
+                return LangchainDocument(
+                    page_content=text,
+                    metadata={
+                        "source": url,
+                        "source_type": "web"
+                    }
+                )
+                
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
+        
+        return None
     
-    def ingest_web_documents(self, urls, name=None):
-        """Scrape and ingest web documents"""
+    def ingest_web_documents(self, urls, name=None, data_source=None):
+        """Scrape and ingest web documents, into data_source if one was already created"""
         if not name:
             name = f'Web docs ({len(urls)} URLs)'
             
         # Create data source record
-        data_source = DataSource.objects.create(
-            name=name,
-            source_type='web',
-            status='processing',
-            metadata={'urls': urls}
-        )
+        if data_source is None:
+            data_source = DataSource.objects.create(
+                name=name,
+                source_type='web',
+                status='processing',
+                metadata={'urls': urls}
+            )
         
+        loading = False
         try:
-            documents = []
+            # Web ingests are small, so they insert into the live index, but still
+            # register as a bulk load so no index rebuild runs underneath them
+            self.begin_bulk_load()
+            loading = True
             
-            for url in urls:
-                try:
-                    response = requests.get(url, timeout=10)
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    text = soup.get_text()
-                    
-                    # Clean up text
-                    lines = (line.strip() for line in text.splitlines())
-                    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                    text = ' '.join(chunk for chunk in chunks if chunk)
-                    
-                    if text:
-                        doc = LangchainDocument(
-                            page_content=text,
-                            metadata={
-                                "source": url,
-                                "source_type": "web"
-                            }
-                        )
-                        documents.append(doc)
-                        
-                except Exception as e:
-                    print(f"Error processing {url}: {e}")
-                    continue
+            # Fetch pages concurrently; each worker is almost entirely network-bound
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                documents = [doc for doc in executor.map(self._fetch_and_clean, urls) if doc]
             
             # Process and store documents
-            doc_count = 0
+            document_objects = self._build_document_objects(data_source, documents)
+            doc_count = len(document_objects)
             with transaction.atomic():
-                for doc in documents:
-                    # Split document into chunks
-                    chunks = self.text_splitter.split_documents([doc])
-                    
-                    for i, chunk in enumerate(chunks):
-                        # Generate embedding
-                        embedding = self.generate_embedding(chunk.page_content)
-                        
-                        # Store in database
-                        Document.objects.create(
-                            source=data_source,
-                            content=chunk.page_content,
-                            embedding=embedding,
-                            metadata=chunk.metadata,
-                            chunk_index=i
-                        )
-                        doc_count += 1
+                self._copy_documents(document_objects)
                 
                 # Update data source
                 data_source.status = 'completed'
                 data_source.document_count = doc_count
                 data_source.save()
             
-            return doc_count
-            
         except Exception as e:
             # Update status to failed
             data_source.status = 'failed'
             data_source.save()
             raise e
+        
+        finally:
+            if loading:
+                self.end_bulk_load()
+        
+        self.clear_result_cache()
+        return doc_count
     
-    def search_documents(self, query, k=5, similarity_threshold=None):
-        """Search for relevant documents using vector similarity"""
+    def search_documents(self, query, k=5, similarity_threshold=None, source_id=None, preview_chars=None):
+        """Search for relevant documents using vector similarity, optionally within one source"""
         if similarity_threshold is None:
             similarity_threshold = getattr(settings, 'SIMILARITY_THRESHOLD', 0.7)
         
         # Generate query embedding
         query_embedding = self.generate_embedding(query)
         
-        # Search for similar documents using L2 distance
-        documents = Document.objects.annotate(
-            distance=L2Distance('embedding', query_embedding)
-        ).filter(
-            distance__lt=similarity_threshold
-        ).order_by('distance')[:k]
+        # Serve near-duplicate queries from the semantic cache; embeddings are
+        # unit length so the dot product is the cosine similarity. Ingests run
+        # in other processes, so the shared corpus version retires stale entries
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        corpus_version = self.get_corpus_version()
+        cache_key = (EMBEDDING_MODEL_NAME, corpus_version, k, similarity_threshold, source_id, preview_chars)
+        cached = self.result_cache.get(cache_key, query_vector)
+        if cached is not None:
+            return cached
+        
+        if self.hnsw_params is None or self._hnsw_params_version != corpus_version:
+            self.hnsw_params = get_hnsw_params(Document.objects.count())
+            self._hnsw_params_version = corpus_version
+        
+        # Optionally pick candidates from binary-quantized embeddings first
+        candidate_count = getattr(settings, 'BINARY_QUANTIZE_CANDIDATES', 0)
+        
+        # An HNSW scan returns at most ef_search rows, so never go below the
+        # number of rows wanted from it, within pgvector's allowed range
+        ef_search = getattr(settings, 'HNSW_EF_SEARCH', None) or self.hnsw_params['ef_search']
+        ef_search = min(max(ef_search, k, candidate_count), HNSW_MAX_EF_SEARCH)
+        iterative_scan = getattr(settings, 'HNSW_ITERATIVE_SCAN', None)
+        
+        # Search for similar documents by inner product, which equals cosine
+        # similarity on normalized embeddings. pgvector's <#> returns the
+        # negated inner product, so cosine distance is 1 + negative_ip.
+        # ef_search trades HNSW recall for speed and only applies to this transaction
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL hnsw.ef_search = %s", [ef_search])
+                # The source and threshold filters run after the index scan; an
+                # iterative scan keeps walking the graph until k rows pass them
+                if iterative_scan:
+                    cursor.execute("SET LOCAL hnsw.iterative_scan = %s", [iterative_scan])
+            
+            # Join the source up front and leave the embedding column in the database
+            queryset = Document.objects.select_related('source').only(
+                'metadata', 'source', 'source__name'
+            )
+            if source_id is not None:
+                queryset = queryset.filter(source_id=source_id)
+            
+            negative_ip = MaxInnerProduct('embedding', query_embedding)
+            
+            # The HNSW scan only yields ef_search rows before the source filter
+            # runs, so a small source in a large corpus would come up short.
+            # Rank scoped searches exactly over the (source, chunk_index) index
+            # instead, unless an iterative scan is on to keep the HNSW scan going
+            exact_rank = source_id is not None and not iterative_scan
+            
+            if candidate_count and not exact_rank:
+                # Stage one: the nearest rows by Hamming distance between the
+                # embeddings' sign bits, served by the binary HNSW index
+                dimensions = settings.VECTOR_DIMENSION
+                candidate_sql = f'SELECT id FROM "{Document._meta.db_table}"'
+                candidate_params = []
+                if source_id is not None:
+                    candidate_sql += ' WHERE source_id = %s'
+                    candidate_params.append(source_id)
+                candidate_sql += (
+                    f' ORDER BY binary_quantize(embedding)::bit({dimensions})'
+                    f' <~> binary_quantize(%s::halfvec)::bit({dimensions}) LIMIT %s'
+                )
+                candidate_params += ['[' + ','.join(map(str, query_vector.tolist())) + ']', candidate_count]
+                queryset = queryset.filter(id__in=RawSQL(candidate_sql, candidate_params))
+                
+                # Stage two re-ranks the candidates by exact inner product
+                exact_rank = True
+            
+            # Adding 0 stops the planner from answering an exact ranking with
+            # the inner-product HNSW index
+            if exact_rank:
+                negative_ip = negative_ip + 0
+            
+            # With preview_chars the content is truncated in SQL, so full chunk
+            # bodies never cross the wire
+            if preview_chars is None:
+                queryset = queryset.annotate(page_content=F('content'))
+            else:
+                queryset = queryset.annotate(page_content=Case(
+                    When(
+                        GreaterThan(Length('content'), preview_chars),
+                        then=Concat(Substr('content', 1, preview_chars), Value('...'))
+                    ),
+                    default=F('content'),
+                    output_field=TextField()
+                ))
+            
+            documents = list(queryset.annotate(
+                negative_ip=negative_ip
+            ).filter(
+                negative_ip__lt=similarity_threshold - 1
+            ).order_by('negative_ip')[:k])
         
         # Convert to langchain-like format for compatibility
         results = []
         for doc in documents:
-            results.append(type('Document', (), {
-                'page_content': doc.content,
-                'metadata': {
+            results.append(SearchHit(
+                page_content=doc.page_content,
+                metadata={
                     **doc.metadata,
                     'source_id': doc.source.id,
                     'source_name': doc.source.name,
-                    'distance': float(doc.distance),
-                    'similarity_score': 1 - float(doc.distance)  # Convert distance to similarity
+                    'distance': 1 + float(doc.negative_ip),
+                    'similarity_score': -float(doc.negative_ip)  # Cosine similarity
                 }
-            })())
+            ))
         
+        # An empty result is likely to change with the next ingest
+        if results:
+            self.result_cache.set(cache_key, query_vector, results)
         return results
     
-    def generate_response(self, query):
-        """Generate response using RAG"""
+    def get_corpus_version(self):
+        """Version of the document corpus, shared between processes through the Django cache"""
+        return cache.get_or_set(CORPUS_VERSION_CACHE_KEY, 0, timeout=None)
+    
+    def clear_result_cache(self):
+        """Drop cached search results, e.g. after the corpus changes, in every process"""
+        try:
+            cache.incr(CORPUS_VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(CORPUS_VERSION_CACHE_KEY, 1, timeout=None)
+        self.result_cache.clear()
+    
+    def get_cache_stats(self):
+        """Get query cache statistics"""
+        with self._cache_lock:
+            embedding_stats = {**self._cache_stats, 'embedding_cache_size': len(self._emb_cache)}
+        return {
+            **embedding_stats,
+            'result_cache': self.result_cache.get_stats(),
+            'query_batcher': self.query_batcher.get_stats()
+        }
+    
+    def begin_bulk_load(self, drop_indexes=False):
+        """Register a bulk load, optionally dropping the HNSW indexes for its duration"""
+        # Concurrent loads share the lock; index rebuilds take it exclusively.
+        # Poll instead of blocking in pg_advisory_lock_shared: a blocked statement
+        # holds a snapshot, which a running CREATE INDEX CONCURRENTLY waits out
+        # while its session holds the lock, and the two would deadlock
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock_shared(%s)", [BULK_LOAD_LOCK_ID])
+                if cursor.fetchone()[0]:
+                    break
+            time.sleep(BULK_LOAD_LOCK_POLL_INTERVAL)
+        
+        # The indexes stay dropped until the last concurrent load finishes, so
+        # usually another load has already dropped them
+        if drop_indexes:
+            try:
+                self.drop_hnsw_index()
+            except Exception:
+                # The caller only ends loads that began, so release the lock here
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock_shared(%s)", [BULK_LOAD_LOCK_ID])
+                raise
+    
+    def end_bulk_load(self):
+        """Finish a bulk load; the last concurrent load to finish rebuilds the indexes"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock_shared(%s)", [BULK_LOAD_LOCK_ID])
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [BULK_LOAD_LOCK_ID])
+            if not cursor.fetchone()[0]:
+                # Another load is still running and rebuilds when it finishes
+                return
+        
+        try:
+            self.configure_hnsw_params()
+        except Exception as e:
+            # Searches fall back to an exact scan until the next load rebuilds
+            print(f"Error rebuilding HNSW index: {e}")
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [BULK_LOAD_LOCK_ID])
+    
+    def drop_hnsw_index(self):
+        """Drop the HNSW indexes ahead of a bulk load; returns False if the table was busy"""
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # DROP INDEX waits for open writes such as a running web ingest,
+                # and every search would queue behind it; load into the live
+                # indexes instead of waiting
+                cursor.execute("SET LOCAL lock_timeout = '2s'")
+                cursor.execute(f"DROP INDEX IF EXISTS {HNSW_INDEX_NAME}")
+                cursor.execute(f"DROP INDEX IF EXISTS {BINARY_HNSW_INDEX_NAME}")
+        except OperationalError:
+            return False
+        return True
+    
+    def _swap_in_index(self, name, definition, params=()):
+        """Build an index without blocking writers or searches, then swap it in for name"""
+        building = f'{name}_new'
+        with connection.cursor() as cursor:
+            # An interrupted CONCURRENTLY build leaves an invalid index behind
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {building}")
+            
+            # Give the build enough memory to keep the graph in RAM and spread
+            # it over parallel maintenance workers. CONCURRENTLY cannot run in a
+            # transaction, so these are session settings, reset afterwards
+            cursor.execute("SET maintenance_work_mem = '2GB'")
+            cursor.execute("SET max_parallel_maintenance_workers = 7")
+            try:
+                cursor.execute(
+                    f'CREATE INDEX CONCURRENTLY {building} ON "{Document._meta.db_table}" {definition}',
+                    params
+                )
+            except Exception:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {building}")
+                raise
+            finally:
+                cursor.execute("RESET maintenance_work_mem")
+                cursor.execute("RESET max_parallel_maintenance_workers")
+            
+            # Only the swap takes the table lock. Like drop_hnsw_index, give up
+            # quickly rather than queue every search behind a slow one, and retry
+            for attempt in range(INDEX_SWAP_ATTEMPTS):
+                try:
+                    with transaction.atomic():
+                        cursor.execute("SET LOCAL lock_timeout = '2s'")
+                        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                        cursor.execute(f"ALTER INDEX {building} RENAME TO {name}")
+                    return
+                except OperationalError:
+                    if attempt == INDEX_SWAP_ATTEMPTS - 1:
+                        # Don't leave an unused copy of the index to maintain
+                        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {building}")
+                        raise
+                    time.sleep(1)
+    
+    def configure_hnsw_params(self):
+        """(Re)build the HNSW index when it is missing or the corpus moves into a new size band, and keep the binary index in step with BINARY_QUANTIZE_CANDIDATES"""
+        params = get_hnsw_params(Document.objects.count())
+        wanted = [f"m={params['m']}", f"ef_construction={params['ef_construction']}"]
+        
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reloptions FROM pg_class WHERE relname = %s", [HNSW_INDEX_NAME])
+            row = cursor.fetchone()
+            cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [BINARY_HNSW_INDEX_NAME])
+            has_binary_index = cursor.fetchone() is not None
+        
+        if row is None or sorted(row[0] or []) != sorted(wanted):
+            self._swap_in_index(
+                HNSW_INDEX_NAME,
+                "USING hnsw (embedding halfvec_ip_ops) WITH (m = %s, ef_construction = %s)",
+                [params['m'], params['ef_construction']]
+            )
+        
+        # The binary index only pays for its upkeep when the two-stage search uses it
+        if getattr(settings, 'BINARY_QUANTIZE_CANDIDATES', 0):
+            if not has_binary_index:
+                dimensions = settings.VECTOR_DIMENSION
+                self._swap_in_index(
+                    BINARY_HNSW_INDEX_NAME,
+                    f"USING hnsw ((binary_quantize(embedding)::bit({dimensions})) bit_hamming_ops)"
+                )
+        elif has_binary_index:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP INDEX IF EXISTS {BINARY_HNSW_INDEX_NAME}")
+        
+        self.hnsw_params = params
+        return params
+    
+    def generate_response_stream(self, query):
+        """Generate response using RAG, yielding it piece by piece"""
         # Get relevant documents
         docs = self.search_documents(query, k=3)
         
         if not docs:
-            return "I don't have enough information in my knowledge base to answer that question. Please add some documents or repositories first."
+            yield "I don't have enough information in my knowledge base to answer that question. Please add some documents or repositories first."
+            return
+        
+        # Enhanced response generation
+        yield "Based on the available documents, here's what I found relevant to your question:\n\n"
         
-        # Format context
-        context_parts = []
+        # Format context, tracking the similarity range in the same pass
+        lowest = highest = None
         for i, doc in enumerate(docs):
             source_name = doc.metadata.get('source_name', 'Unknown source')
             source_type = doc.metadata.get('source_type', 'document')
             similarity = doc.metadata.get('similarity_score', 0)
+            lowest = similarity if lowest is None else min(lowest, similarity)
+            highest = similarity if highest is None else max(highest, similarity)
             
-            context_parts.append(
-                f"[Source {i+1} - {source_type} ({source_name}) - Similarity: {similarity:.2f}]: {doc.page_content[:800]}"
-            )
-        
-        context = "\n\n".join(context_parts)
+            if i:
+                yield "\n\n"
+            yield f"[Source {i+1} - {source_type} ({source_name}) - Similarity: {similarity:.2f}]: {doc.page_content[:800]}"
         
-        # Enhanced response generation
-        response = f"""Based on the available documents, here's what I found relevant to your question:
-
-{context}
+        yield f"""
 
 **Summary**: The information above should help answer your question about: "{query}"
 
-**Sources**: Found {len(docs)} relevant document sections from your knowledge base with similarity scores ranging from {min(doc.metadata.get('similarity_score', 0) for doc in docs):.2f} to {max(doc.metadata.get('similarity_score', 0) for doc in docs):.2f}."""
-        
-        return response
+**Sources**: Found {len(docs)} relevant document sections from your knowledge base with similarity scores ranging from {lowest:.2f} to {highest:.2f}."""
+    
+    def generate_response(self, query):
+        """Generate response using RAG"""
+        return ''.join(self.generate_response_stream(query))
     
     def get_stats(self):
         """Get vector database statistics"""
         return {
             'total_documents': Document.objects.count(),
             'total_sources': DataSource.objects.count(),
-            'documents_by_source': {
-                source.name: source.documents.count() 
-                for source in DataSource.objects.all()
-            },
-            'embedding_dimension': settings.VECTOR_DIMENSION
+            'documents_by_source': dict(
+                DataSource.objects.annotate(count=Count('documents')).values_list('name', 'count')
+            ),
+            'embedding_dimension': settings.VECTOR_DIMENSION,
+            'query_cache': self.get_cache_stats()
         }
     
     def delete_source_documents(self, source_id):
@@ -277,6 +800,7 @@ class VectorRAGService:
             source = DataSource.objects.get(id=source_id)
             deleted_count = source.documents.count()
             source.documents.all().delete()
+            self.clear_result_cache()
             return deleted_count
         except DataSource.DoesNotExist:
             raise ValueError(f"Data source with id {source_id} not found")
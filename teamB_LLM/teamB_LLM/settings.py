@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'teamB_LLM.middleware.StreamAwareGZipMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,6 +87,10 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Keep connections open between requests instead of reconnecting each time;
+        # ASGI deployments should set DB_CONN_MAX_AGE=0 (see .env.example)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'sslmode': 'prefer',
         },
@@ -94,7 +99,11 @@ DATABASES = {
 
 # Use dj-database-url if DATABASE_URL is provided
 if 'DATABASE_URL' in os.environ:
-    DATABASES['default'] = dj_database_url.parse(os.environ['DATABASE_URL'])
+    DATABASES['default'] = dj_database_url.parse(
+        os.environ['DATABASE_URL'],
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=True
+    )
 
 
 # Password validation
@@ -154,10 +163,64 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
     ],
 }
 
+# Cache (per-process memory by default)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Share the cache between workers if REDIS_URL is provided; needed for Celery
+# ingests to invalidate the search result caches of the web processes
+if 'REDIS_URL' in os.environ:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Celery runs repository and web ingestion in the background. Set
+# CELERY_TASK_ALWAYS_EAGER=True to run tasks inline when no broker is available
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Seconds health_check / get_stats results are served from the cache
+STATS_CACHE_TIMEOUT = 10
+
+# Pagination for list endpoints (?page=&page_size=)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
 # Vector database settings
 VECTOR_DIMENSION = 384  # For sentence-transformers/all-MiniLM-L6-v2
-SIMILARITY_THRESHOLD = 0.7
\ No newline at end of file
+SIMILARITY_THRESHOLD = 0.7  # Maximum cosine distance for a search hit
+SEARCH_MAX_RESULTS = 100  # Upper bound for the search endpoint's k
+
+# HNSW search tuning. HNSW_EF_SEARCH overrides the ef_search picked for the
+# corpus size (None = automatic). HNSW_ITERATIVE_SCAN ('strict_order' or
+# 'relaxed_order', needs pgvector >= 0.8) keeps filtered searches from
+# returning fewer than k hits
+HNSW_EF_SEARCH = int(os.environ['HNSW_EF_SEARCH']) if 'HNSW_EF_SEARCH' in os.environ else None
+HNSW_ITERATIVE_SCAN = os.environ.get('HNSW_ITERATIVE_SCAN') or None
+
+# Two-stage search: take this many candidates by Hamming distance over the
+# binary-quantized embeddings, then re-rank them by exact inner product
+# (0 = search the halfvec index directly)
+BINARY_QUANTIZE_CANDIDATES = int(os.environ.get('BINARY_QUANTIZE_CANDIDATES', '0'))
+
+# Query embeddings are batched across concurrent requests: a batch runs once
+# EMBEDDING_BATCH_MAX_SIZE queries are waiting or EMBEDDING_BATCH_WINDOW seconds
+# after the first one arrived
+EMBEDDING_BATCH_MAX_SIZE = 32
+EMBEDDING_BATCH_WINDOW = 0.1
+
+# Semantic cache of search results: near-duplicate queries (cosine >= threshold)
+# reuse cached hits for up to SEMANTIC_CACHE_TTL seconds
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_TTL = 600
+SEMANTIC_CACHE_SIZE = 1024
\ No newline at end of file
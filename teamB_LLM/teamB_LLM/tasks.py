@@ -0,0 +1,19 @@
+from celery import shared_task
+
+from .models import DataSource
+from .services import rag_service
+
+
+@shared_task
+def ingest_github_task(source_id, repo_url, repo_name):
+    """Ingest a GitHub repository into an existing data source"""
+    data_source = DataSource.objects.get(id=source_id)
+    # The service marks the source completed (with document_count) or failed
+    return rag_service.ingest_github_repo(repo_url, repo_name, data_source=data_source)
+
+
+@shared_task
+def ingest_web_task(source_id, urls, name):
+    """Ingest web documents into an existing data source"""
+    data_source = DataSource.objects.get(id=source_id)
+    return rag_service.ingest_web_documents(urls, name, data_source=data_source)
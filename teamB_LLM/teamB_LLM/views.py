@@ -1,18 +1,71 @@
 import json
 import uuid
-from django.http import JsonResponse
+import hashlib
+from asgiref.sync import sync_to_async
+from celery import group
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import etag, require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.core.paginator import Paginator
+from django.db.models import Count, Max, Q
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
 from .services import rag_service
+from .tasks import ingest_github_task, ingest_web_task
 from .models import ChatSession, Message, DataSource, Document
 
+def paginate(request, queryset):
+    """Return one page of a queryset and its pagination metadata from ?page=&page_size="""
+    try:
+        page_size = int(request.GET.get('page_size', settings.API_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.API_PAGE_SIZE
+    page_size = max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+    
+    paginator = Paginator(queryset, page_size)
+    page = paginator.get_page(request.GET.get('page', 1))
+    
+    return page, {
+        'count': paginator.count,
+        'page': page.number,
+        'page_size': page_size,
+        'num_pages': paginator.num_pages,
+        'next': page.next_page_number() if page.has_next() else None,
+        'previous': page.previous_page_number() if page.has_previous() else None
+    }
+
+def parse_session_id(value):
+    """Return value as a UUID, or None if it is not a valid session id"""
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError):
+        return None
+
+def listing_etag(request, queryset, timestamp_field):
+    """ETag for a paginated listing: changes when rows are added, removed or updated, or the query string changes"""
+    state = queryset.aggregate(latest=Max(timestamp_field), count=Count('id'))
+    key = f"{state['latest']}:{state['count']}:{request.GET.urlencode()}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+def chat_history_etag(request, session_id):
+    """ETag for get_chat_history; None for malformed ids so the view returns its 400"""
+    session_id = parse_session_id(session_id)
+    if session_id is None:
+        return None
+    return listing_etag(request, Message.objects.filter(session__session_id=session_id), 'timestamp')
+
+def data_sources_etag(request):
+    """ETag for get_data_sources"""
+    return listing_etag(request, DataSource.objects.all(), 'updated_at')
+
 # ==================== CHAT ENDPOINTS ====================
 
 @csrf_exempt
@@ -26,7 +79,7 @@ def create_chat_session(request):
         
         return Response({
             'session_id': str(chat_session.session_id),
-            'created_at': chat_session.created_at.isoformat()
+            'created_at': chat_session.created_at
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
@@ -40,37 +93,47 @@ def get_chat_sessions(request):
             sessions = ChatSession.objects.filter(user=request.user)
         else:
             # For anonymous users, you might want to use session storage
-            sessions = ChatSession.objects.all()[:10]  # Limit for demo
+            sessions = ChatSession.objects.all()
+        
+        # Count messages in the same query instead of once per session, and
+        # fetch only the columns the listing returns
+        sessions = sessions.values('session_id', 'created_at', 'updated_at').annotate(
+            message_count=Count('messages')
+        ).order_by('-created_at', '-id')
+        page, pagination = paginate(request, sessions)
             
-        sessions_data = [{
-            'session_id': str(session.session_id),
-            'created_at': session.created_at.isoformat(),
-            'updated_at': session.updated_at.isoformat(),
-            'message_count': session.messages.count()
-        } for session in sessions.order_by('-created_at')]
+        # The renderer serializes the UUIDs and datetimes in these rows natively
+        sessions_data = list(page.object_list)
         
-        return Response({'sessions': sessions_data})
+        return Response({'sessions': sessions_data, **pagination})
         
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@etag(chat_history_etag)
 @api_view(['GET'])
 def get_chat_history(request, session_id):
     """Get chat history for a session"""
+    session_id = parse_session_id(session_id)
+    if session_id is None:
+        return Response({'error': 'Invalid session ID'}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
         chat_session = ChatSession.objects.get(session_id=session_id)
-        messages = chat_session.messages.all().order_by('timestamp')
+        messages = chat_session.messages.only('id', 'content', 'is_user', 'timestamp').order_by('timestamp', 'id')
+        page, pagination = paginate(request, messages)
         
         messages_data = [{
             'id': msg.id,
             'content': msg.content,
             'is_user': msg.is_user,
-            'timestamp': msg.timestamp.isoformat()
-        } for msg in messages]
+            'timestamp': msg.timestamp
+        } for msg in page.object_list]
         
         return Response({
             'session_id': str(session_id),
-            'messages': messages_data
+            'messages': messages_data,
+            **pagination
         })
         
     except ChatSession.DoesNotExist:
@@ -78,67 +141,117 @@ def get_chat_history(request, session_id):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+async def iterate_in_thread(iterator):
+    """Drive a blocking iterator from async code, one item per worker-thread hop"""
+    iterator = iter(iterator)
+    done = object()
+    while True:
+        # The iterator runs ORM queries; thread_sensitive keeps them on the
+        # request's own sync thread, whose connection Django closes or recycles
+        # at the end of the request (under ASGI that thread is per request)
+        item = await sync_to_async(next, thread_sensitive=True)(iterator, done)
+        if item is done:
+            break
+        yield item
+
+def save_exchange(chat_session, user_message, bot_response):
+    """Store a user message and its reply, and touch the session, in one transaction"""
+    user_msg = Message(session=chat_session, content=user_message, is_user=True)
+    bot_msg = Message(session=chat_session, content=bot_response, is_user=False)
+    with transaction.atomic():
+        Message.objects.bulk_create([user_msg, bot_msg])
+        chat_session.save(update_fields=['updated_at'])
+    return user_msg, bot_msg
+
+def message_payload(message):
+    """Serialize a Message for send_message responses"""
+    return {
+        'id': message.id,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat()
+    }
+
 @csrf_exempt
-@api_view(['POST'])
-def send_message(request):
-    """Send a message and get AI response"""
+@require_http_methods(['POST'])
+async def send_message(request):
+    """Send a message and get AI response; streamed as Server-Sent Events with ?stream=1"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
-        data = request.data
         user_message = data.get('message', '').strip()
         session_id = data.get('session_id')
         
         if not user_message:
-            return Response({'error': 'Message cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': 'Message cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
         
         if not session_id:
-            return Response({'error': 'Session ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': 'Session ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        session_id = parse_session_id(session_id)
+        if session_id is None:
+            return JsonResponse({'error': 'Invalid session ID'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Get or create session
-        chat_session, _ = ChatSession.objects.get_or_create(
+        user = await request.auser()
+        chat_session, _ = await ChatSession.objects.aget_or_create(
             session_id=session_id,
-            defaults={'user': request.user if request.user.is_authenticated else None}
+            defaults={'user': user if user.is_authenticated else None}
         )
         
-        # Save user message
-        user_msg = Message.objects.create(
-            session=chat_session,
-            content=user_message,
-            is_user=True
-        )
+        # Generate AI response; retrieval blocks, so it runs on a worker thread
+        pieces = iterate_in_thread(rag_service.generate_response_stream(user_message))
         
-        # Generate AI response
-        bot_response = rag_service.generate_response(user_message)
+        if request.GET.get('stream') == '1' or 'text/event-stream' in request.headers.get('Accept', ''):
+            async def event_stream():
+                parts = []
+                try:
+                    async for piece in pieces:
+                        parts.append(piece)
+                        yield f"data: {json.dumps({'content': piece})}\n\n"
+                    
+                    # Save both messages once the reply is complete
+                    user_msg, bot_msg = await sync_to_async(save_exchange)(
+                        chat_session, user_message, ''.join(parts)
+                    )
+                    done = {'user_message': message_payload(user_msg), 'bot_response': message_payload(bot_msg)}
+                    yield f"event: done\ndata: {json.dumps(done)}\n\n"
+                except Exception as e:
+                    yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            
+            response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            return response
         
-        # Save bot response
-        bot_msg = Message.objects.create(
-            session=chat_session,
-            content=bot_response,
-            is_user=False
-        )
+        bot_response = ''.join([piece async for piece in pieces])
         
-        return Response({
-            'user_message': {
-                'id': user_msg.id,
-                'content': user_message,
-                'timestamp': user_msg.timestamp.isoformat()
-            },
-            'bot_response': {
-                'id': bot_msg.id,
-                'content': bot_response,
-                'timestamp': bot_msg.timestamp.isoformat()
-            }
+        # Save both messages once the reply is complete
+        user_msg, bot_msg = await sync_to_async(save_exchange)(chat_session, user_message, bot_response)
+        
+        return JsonResponse({
+            'user_message': message_payload(user_msg),
+            'bot_response': message_payload(bot_msg)
         })
         
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @csrf_exempt
 @api_view(['DELETE'])
 def clear_chat_history(request, session_id):
     """Clear chat history for a session"""
+    session_id = parse_session_id(session_id)
+    if session_id is None:
+        return Response({'error': 'Invalid session ID'}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
         chat_session = ChatSession.objects.get(session_id=session_id)
-        chat_session.messages.all().delete()
+        # Message has no dependent rows or delete signals, so skip the collector
+        # and issue a single DELETE
+        messages = Message.objects.filter(session=chat_session)
+        messages._raw_delete(messages.db)
         
         return Response({'message': 'Chat history cleared successfully'})
         
@@ -149,45 +262,72 @@ def clear_chat_history(request, session_id):
 
 # ==================== DATA INGESTION ENDPOINTS ====================
 
+def prepare_github_ingest(repo_url, repo_name=''):
+    """Create a processing DataSource for a repository; returns its payload and the ingest task signature"""
+    repo_url = repo_url.strip()
+    if not repo_url:
+        raise ValueError('Repository URL is required')
+    
+    # Extract repo name if not provided
+    repo_name = repo_name.strip() or repo_url.split('/')[-1].replace('.git', '')
+    
+    data_source = DataSource.objects.create(
+        name=repo_name,
+        source_type='github',
+        url=repo_url,
+        status='processing',
+        metadata={'repo_url': repo_url}
+    )
+    payload = {
+        'id': data_source.id,
+        'message': f'Ingestion of {repo_name} started',
+        'status': 'processing'
+    }
+    return payload, ingest_github_task.s(data_source.id, repo_url, repo_name)
+
+def prepare_web_ingest(urls, name=None):
+    """Create a processing DataSource for web pages; returns its payload and the ingest task signature"""
+    if not urls:
+        raise ValueError('URLs are required')
+    
+    name = name or f'Web docs ({len(urls)} URLs)'
+    data_source = DataSource.objects.create(
+        name=name,
+        source_type='web',
+        status='processing',
+        metadata={'urls': urls}
+    )
+    payload = {
+        'id': data_source.id,
+        'message': f'Ingestion of {len(urls)} web documents started',
+        'status': 'processing'
+    }
+    return payload, ingest_web_task.s(data_source.id, urls, name)
+
+def enqueue_ingest(source_ids, task):
+    """Queue an ingest task or group; if the broker is unreachable, mark its sources failed"""
+    try:
+        return task.apply_async()
+    except Exception:
+        # update() skips auto_now, and the data source ETag depends on updated_at
+        DataSource.objects.filter(id__in=source_ids).update(status='failed', updated_at=timezone.now())
+        raise
+
 @csrf_exempt
 @api_view(['POST'])
 def ingest_github_repo(request):
     """Ingest GitHub repository"""
     try:
         data = request.data
-        repo_url = data.get('repo_url', '').strip()
-        repo_name = data.get('repo_name', '').strip()
-        
-        if not repo_url:
-            return Response({'error': 'Repository URL is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Extract repo name if not provided
-        if not repo_name:
-            repo_name = repo_url.split('/')[-1].replace('.git', '')
-        
-        # Create data source record
-        data_source = DataSource.objects.create(
-            name=repo_name,
-            source_type='github',
-            url=repo_url,
-            status='processing'
-        )
+        payload, task = prepare_github_ingest(data.get('repo_url', ''), data.get('repo_name', ''))
         
-        # Process repository
-        try:
-            doc_count = rag_service.ingest_github_repo(repo_url, repo_name)
-        except Exception as e:
-            data_source.status = 'failed'
-            data_source.save()
-            return Response({'error': f'Failed to ingest repository: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Process repository in the background; poll get_data_sources for status
+        enqueue_ingest([payload['id']], task)
         
-        return Response({
-            'id': data_source.id,
-            'message': f'Successfully ingested {doc_count} documents from {repo_name}',
-            'doc_count': doc_count,
-            'status': 'completed'
-        })
-            
+        return Response(payload, status=status.HTTP_202_ACCEPTED)
+    
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -197,55 +337,37 @@ def ingest_web_documents(request):
     """Ingest web documents"""
     try:
         data = request.data
-        urls = data.get('urls', [])
-        name = data.get('name', f'Web docs ({len(urls)} URLs)')
+        payload, task = prepare_web_ingest(data.get('urls', []), data.get('name'))
         
-        if not urls:
-            return Response({'error': 'URLs are required'}, status=status.HTTP_400_BAD_REQUEST)
+        # Process URLs in the background; poll get_data_sources for status
+        enqueue_ingest([payload['id']], task)
         
-        # Create data source record
-        data_source = DataSource.objects.create(
-            name=name,
-            source_type='web',
-            status='processing'
-        )
-        
-        try:
-            # Process URLs
-            doc_count = rag_service.ingest_web_documents(urls, name)
-            
-            return Response({
-                'id': data_source.id,
-                'message': f'Successfully ingested {doc_count} web documents',
-                'doc_count': doc_count,
-                'status': 'completed'
-            })
-            
-        except Exception as e:
-            return Response({'error': f'Failed to ingest web documents: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
+        return Response(payload, status=status.HTTP_202_ACCEPTED)
+    
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+DATA_SOURCE_FIELDS = (
+    'id', 'name', 'source_type', 'url', 'status', 'document_count', 'created_at', 'updated_at', 'metadata'
+)
+
+@etag(data_sources_etag)
 @api_view(['GET'])
 def get_data_sources(request):
-    """Get all data sources"""
+    """Get all data sources; ?fields=name,status limits the returned columns"""
     try:
-        sources = DataSource.objects.all().order_by('-created_at')
-        
-        sources_data = [{
-            'id': source.id,
-            'name': source.name,
-            'source_type': source.source_type,
-            'url': source.url,
-            'status': source.status,
-            'document_count': source.document_count,
-            'created_at': source.created_at.isoformat(),
-            'updated_at': source.updated_at.isoformat(),
-            'metadata': source.metadata
-        } for source in sources]
-        
-        return Response({'sources': sources_data})
+        fields = [field for field in request.GET.get('fields', '').split(',') if field in DATA_SOURCE_FIELDS]
+        if not fields:
+            fields = DATA_SOURCE_FIELDS
+        elif 'id' not in fields:
+            fields.insert(0, 'id')
+        
+        sources = DataSource.objects.values(*fields).order_by('-created_at', '-id')
+        page, pagination = paginate(request, sources)
+        
+        return Response({'sources': list(page.object_list), **pagination})
         
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -282,15 +404,28 @@ def search_documents(request):
         data = request.data
         query = data.get('query', '').strip()
         k = data.get('k', 5)  # Number of results
+        source_id = data.get('source_id')  # Optionally restrict to one data source
         
         if not query:
             return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
         
+        try:
+            k = int(k)
+        except (ValueError, TypeError):
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        k = max(1, min(k, settings.SEARCH_MAX_RESULTS))
+        
+        if source_id is not None:
+            try:
+                source_id = int(source_id)
+            except (ValueError, TypeError):
+                return Response({'error': 'source_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
         # Search documents
-        docs = rag_service.search_documents(query, k=k)
+        docs = rag_service.search_documents(query, k=k, source_id=source_id, preview_chars=500)
         
         results = [{
-            'content': doc.page_content[:500] + '...' if len(doc.page_content) > 500 else doc.page_content,
+            'content': doc.page_content,
             'metadata': doc.metadata,
             'similarity_score': doc.metadata.get('similarity_score'),
             'distance': doc.metadata.get('distance')
@@ -307,32 +442,77 @@ def search_documents(request):
 
 # ==================== STATUS & HEALTH ENDPOINTS ====================
 
+def get_cached(request, key, compute):
+    """Serve a value from the cache for STATS_CACHE_TIMEOUT seconds; staff can bypass with ?nocache=1"""
+    if request.GET.get('nocache') == '1' and request.user.is_staff:
+        value = compute()
+        cache.set(key, value, timeout=settings.STATS_CACHE_TIMEOUT)
+        return value
+    return cache.get_or_set(key, compute, timeout=settings.STATS_CACHE_TIMEOUT)
+
+def compute_health_counts():
+    """Count rows reported by the health check"""
+    total_documents = Document.objects.count()
+    return {
+        'vector_database': {
+            'document_count': total_documents,
+            'embedding_dimension': settings.VECTOR_DIMENSION
+        },
+        'database': {
+            **DataSource.objects.aggregate(
+                total_sources=Count('id'),
+                active_sources=Count('id', filter=Q(status='completed'))
+            ),
+            'total_sessions': ChatSession.objects.count(),
+            'total_documents': total_documents
+        }
+    }
+
+def compute_stats():
+    """Compute system statistics"""
+    vector_stats = rag_service.get_stats()
+    
+    # One aggregate query per model instead of a COUNT per counter
+    source_counts = DataSource.objects.aggregate(
+        total=Count('id'),
+        github_repos=Count('id', filter=Q(source_type='github')),
+        web_docs=Count('id', filter=Q(source_type='web')),
+        processing=Count('id', filter=Q(status='processing')),
+        completed=Count('id', filter=Q(status='completed')),
+        failed=Count('id', filter=Q(status='failed'))
+    )
+    message_counts = Message.objects.aggregate(
+        total_messages=Count('id'),
+        user_messages=Count('id', filter=Q(is_user=True)),
+        bot_messages=Count('id', filter=Q(is_user=False))
+    )
+    
+    return {
+        'data_sources': source_counts,
+        'chat_sessions': {
+            'total': ChatSession.objects.count(),
+            **message_counts
+        },
+        'vector_database': vector_stats
+    }
+
 @api_view(['GET'])
 def health_check(request):
     """Health check endpoint"""
     try:
-        # Check vector database
-        vector_stats = rag_service.get_stats()
+        # Liveness is always checked against the database; only the counts are cached
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
         
-        # Check database
-        total_sources = DataSource.objects.count()
-        active_sources = DataSource.objects.filter(status='completed').count()
-        total_sessions = ChatSession.objects.count()
-        total_documents = Document.objects.count()
+        counts = get_cached(request, 'system:health_counts', compute_health_counts)
         
         return Response({
             'status': 'healthy',
             'vector_database': {
                 'status': 'connected',
-                'document_count': total_documents,
-                'embedding_dimension': vector_stats.get('embedding_dimension')
+                **counts['vector_database']
             },
-            'database': {
-                'total_sources': total_sources,
-                'active_sources': active_sources,
-                'total_sessions': total_sessions,
-                'total_documents': total_documents
-            }
+            'database': counts['database']
         })
         
     except Exception as e:
@@ -345,25 +525,7 @@ def health_check(request):
 def get_stats(request):
     """Get system statistics"""
     try:
-        vector_stats = rag_service.get_stats()
-        
-        stats = {
-            'data_sources': {
-                'total': DataSource.objects.count(),
-                'github_repos': DataSource.objects.filter(source_type='github').count(),
-                'web_docs': DataSource.objects.filter(source_type='web').count(),
-                'processing': DataSource.objects.filter(status='processing').count(),
-                'completed': DataSource.objects.filter(status='completed').count(),
-                'failed': DataSource.objects.filter(status='failed').count()
-            },
-            'chat_sessions': {
-                'total': ChatSession.objects.count(),
-                'total_messages': Message.objects.count(),
-                'user_messages': Message.objects.filter(is_user=True).count(),
-                'bot_messages': Message.objects.filter(is_user=False).count()
-            },
-            'vector_database': vector_stats
-        }
+        stats = get_cached(request, 'system:stats', compute_stats)
         
         return Response(stats)
         
@@ -384,48 +546,35 @@ def batch_ingest(request):
             return Response({'error': 'Sources list is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         results = []
+        tasks = []
         
+        # Register every source first, then queue all ingests as one group so
+        # workers process them concurrently
         for source in sources:
             source_type = source.get('type')
             
-            if source_type == 'github':
-                try:
-                    # Create a mock request with the source data
-                    mock_request = type('MockRequest', (), {'data': source})()
-                    result = ingest_github_repo(mock_request)
-                    results.append({
-                        'source': source,
-                        'status': 'success',
-                        'result': result.data
-                    })
-                except Exception as e:
-                    results.append({
-                        'source': source,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            try:
+                if source_type == 'github':
+                    payload, task = prepare_github_ingest(source.get('repo_url', ''), source.get('repo_name', ''))
+                elif source_type == 'web':
+                    payload, task = prepare_web_ingest(source.get('urls', []), source.get('name'))
+                else:
+                    raise ValueError(f'Unknown source type: {source_type}')
+            except ValueError as e:
+                results.append({'source': source, 'status': 'failed', 'error': str(e)})
+                continue
             
-            elif source_type == 'web':
-                try:
-                    # Create a mock request with the source data
-                    mock_request = type('MockRequest', (), {'data': source})()
-                    result = ingest_web_documents(mock_request)
-                    results.append({
-                        'source': source,
-                        'status': 'success',
-                        'result': result.data
-                    })
-                except Exception as e:
-                    results.append({
-                        'source': source,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            tasks.append(task)
+            results.append({'source': source, 'status': 'processing', 'result': payload})
+        
+        source_ids = [result['result']['id'] for result in results if result['status'] == 'processing']
+        group_id = enqueue_ingest(source_ids, group(tasks)).id if tasks else None
         
         return Response({
-            'message': f'Processed {len(sources)} sources',
+            'message': f'Queued {len(tasks)} of {len(sources)} sources',
+            'group_id': group_id,
             'results': results
-        })
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
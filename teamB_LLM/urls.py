@@ -1,19 +1,25 @@
+import orjson
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse
+
+# The root response never changes, so serialize it once at import
+API_ROOT = orjson.dumps({
+    'message': 'RAG Chatbot API',
+    'version': '1.0',
+    'endpoints': {
+        'chat': '/api/chat/',
+        'ingest': '/api/ingest/',
+        'search': '/api/search/',
+        'health': '/api/health/',
+        'admin': '/admin/'
+    }
+})
 
 def api_root(request):
-    return JsonResponse({
-        'message': 'RAG Chatbot API',
-        'version': '1.0',
-        'endpoints': {
-            'chat': '/api/chat/',
-            'ingest': '/api/ingest/',
-            'search': '/api/search/',
-            'health': '/api/health/',
-            'admin': '/admin/'
-        }
-    })
+    response = HttpResponse(API_ROOT, content_type='application/json')
+    response['Cache-Control'] = 'public, max-age=3600'
+    return response
 
 urlpatterns = [
     path('admin/', admin.site.urls),